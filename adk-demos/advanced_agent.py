@@ -3,14 +3,16 @@ Advanced ADK Agent Example
 Demonstrates multi-tool orchestration and complex workflows
 """
 import os
-import sys
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Add src to path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Shared prefix for masked API-key display
+_MASK = "********"
+
+# The script's own directory is already sys.path[0] when run directly,
+# so the src package imports without mutating sys.path
 from src.agent import ADKAgent
 from src.tools import get_all_tools
 
@@ -49,11 +51,10 @@ def demonstrate_tool_orchestration():
         "If I have $500 and the hotel costs $120 per night, how many nights can I stay?"
     ]
     
-    for query in queries:
+    for query, result in zip(queries, agent.invoke_batch(queries)):
         print(f"\nUser: {query}")
-        result = agent.invoke(query)
         print(f"Agent: {result['output']}")
-    
+
     # Example 2: Memory and context
     print("\n" + "-" * 70)
     print("Example 2: Conversation Memory")
@@ -66,9 +67,8 @@ def demonstrate_tool_orchestration():
         "What was my name again?"
     ]
     
-    for query in context_queries:
+    for query, result in zip(context_queries, agent.invoke_batch(context_queries)):
         print(f"\nUser: {query}")
-        result = agent.invoke(query)
         print(f"Agent: {result['output']}")
     
     # Show conversation history
@@ -92,9 +92,8 @@ def demonstrate_tool_orchestration():
         "What's 15 * 23 + 8?",  # Complex calculation
     ]
     
-    for query in test_queries:
+    for query, result in zip(test_queries, agent.invoke_batch(test_queries)):
         print(f"\nUser: {query}")
-        result = agent.invoke(query)
         print(f"Agent: {result['output']}")
     
     print("\n" + "=" * 70)
@@ -113,11 +112,11 @@ def demonstrate_configuration():
     print(f"\n1. Minimal Agent:")
     print(f"   Name: {minimal_agent.name}")
     print(f"   Tools: {len(minimal_agent.tools)}")
-    
-    # Full configuration
-    full_agent = ADKAgent(
+
+    # Full configuration, cloned from the minimal template so shared
+    # state is referenced rather than rebuilt
+    full_agent = minimal_agent.clone(
         name="full-featured",
-        model="gemini-pro",
         tools=get_all_tools(),
         system_prompt="You are a specialized agent for data analysis."
     )
@@ -131,7 +130,8 @@ def demonstrate_configuration():
 if __name__ == "__main__":
     # Check environment
     print("Environment Check:")
-    print(f"  GOOGLE_API_KEY: {'*' * 8}{os.getenv('GOOGLE_API_KEY', 'NOT SET')[-4:] if os.getenv('GOOGLE_API_KEY') else 'NOT SET'}")
+    google_key = os.getenv("GOOGLE_API_KEY")
+    print(f"  GOOGLE_API_KEY: {_MASK + google_key[-4:] if google_key else 'NOT SET'}")
     print(f"  Working Directory: {os.getcwd()}")
     print()
     
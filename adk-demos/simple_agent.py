@@ -3,50 +3,106 @@ Simple ADK Agent Example
 Demonstrates basic agent with tool use and conversation memory.
 """
 import os
+import random
+from collections import deque
+from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Shared prefix for masked API-key display
+_MASK = "********"
+
+# Pre-drawn pools of random integers: one vectorized NumPy draw amortizes
+# the RNG cost over many tool calls; without NumPy fall back to per-call
+# random
+try:
+    import numpy as _np
+
+    _rng = _np.random.default_rng()
+
+    def _int_pool(low, high, size=4096):
+        while True:
+            for value in _rng.integers(low, high + 1, size=size).tolist():
+                yield value
+
+except ImportError:
+    def _int_pool(low, high, size=4096):
+        while True:
+            yield random.randint(low, high)
+
+_CITIES = ("New York", "London", "Tokyo", "Sydney")
+_CITY_POOL = _int_pool(0, len(_CITIES) - 1)
+_TEMP_POOL = _int_pool(15, 30)
+
+# Intent keywords compiled once at import. With pyahocorasick installed a
+# single DFA pass finds every keyword; otherwise plain substring scans.
+_INTENT_KEYWORDS = ("hello", "weather", "time", "calculate")
+
+try:
+    import ahocorasick
+
+    _AC = ahocorasick.Automaton()
+    for _keyword in _INTENT_KEYWORDS:
+        _AC.add_word(_keyword, _keyword)
+    _AC.make_automaton()
+
+    def _detect_intents(text):
+        return {intent for _, intent in _AC.iter(text)}
+
+except ImportError:
+    def _detect_intents(text):
+        return {keyword for keyword in _INTENT_KEYWORDS if keyword in text}
+
+
 # Mock ADK imports (since ADK might not be installed)
 # In real usage: from google.adk import Agent, Tool
 class MockAgent:
     """Mock ADK Agent for demonstration"""
-    def __init__(self, name, model, tools=None, system_prompt=None):
+    def __init__(self, name, model, tools=None, system_prompt=None, max_history=None):
         self.name = name
         self.model = model
         self.tools = tools or []
         self.system_prompt = system_prompt
-        self.conversation_history = []
-        
+        # Parallel role/content deques instead of one dict per message;
+        # a bounded max_history keeps long demos from growing unbounded
+        self._roles = deque(maxlen=max_history)
+        self._contents = deque(maxlen=max_history)
+
+    @property
+    def conversation_history(self):
+        """Conversation as a list of role/content dicts"""
+        return [{"role": role, "content": content}
+                for role, content in zip(self._roles, self._contents)]
+
     def run(self, user_input):
         """Mock agent execution"""
-        self.conversation_history.append({"role": "user", "content": user_input})
+        self._roles.append("user")
+        self._contents.append(user_input)
         
         # Simple response logic (in real ADK, this calls LLM)
-        if "hello" in user_input.lower():
+        intents = _detect_intents(user_input.lower())
+        if "hello" in intents:
             response = "Hello! I'm your AI assistant. How can I help you today?"
-        elif "weather" in user_input.lower():
+        elif "weather" in intents:
             response = self._mock_tool_call("get_weather", user_input)
-        elif "time" in user_input.lower():
+        elif "time" in intents:
             response = self._mock_tool_call("get_current_time")
-        elif "calculate" in user_input.lower():
+        elif "calculate" in intents:
             response = self._mock_tool_call("calculator", user_input)
         else:
             response = f"I received: '{user_input}'. I'm a demo agent. Try asking about weather, time, or calculations!"
         
-        self.conversation_history.append({"role": "assistant", "content": response})
+        self._roles.append("assistant")
+        self._contents.append(response)
         return response
     
     def _mock_tool_call(self, tool_name, input_data=""):
         """Simulate tool calls"""
-        import random
-        from datetime import datetime
-        
         if tool_name == "get_weather":
-            cities = ["New York", "London", "Tokyo", "Sydney"]
-            city = random.choice(cities)
-            temp = random.randint(15, 30)
+            city = _CITIES[next(_CITY_POOL)]
+            temp = next(_TEMP_POOL)
             return f"[Tool: get_weather] Current weather in {city}: {temp}°C, Partly Cloudy"
         
         elif tool_name == "get_current_time":
@@ -99,12 +155,12 @@ def main():
     print("=" * 60)
     
     # Check for API keys (masked)
-    google_key = os.getenv("GOOGLE_API_KEY", "")
-    openai_key = os.getenv("OPENAI_API_KEY", "")
-    
+    google_key = os.getenv("GOOGLE_API_KEY")
+    openai_key = os.getenv("OPENAI_API_KEY")
+
     print("\nEnvironment Setup:")
-    print(f"  GOOGLE_API_KEY: {'*' * 8}{google_key[-4:] if google_key else 'NOT SET'}")
-    print(f"  OPENAI_API_KEY: {'*' * 8}{openai_key[-4:] if openai_key else 'NOT SET'}")
+    print(f"  GOOGLE_API_KEY: {_MASK + google_key[-4:] if google_key else 'NOT SET'}")
+    print(f"  OPENAI_API_KEY: {_MASK + openai_key[-4:] if openai_key else 'NOT SET'}")
     print(f"  AGENT_NAME: {os.getenv('AGENT_NAME', 'simple-assistant')}")
     print(f"  AGENT_MODEL: {os.getenv('AGENT_MODEL', 'gemini-pro')}")
     
@@ -2,8 +2,80 @@
 Agent module for ADK demos
 Contains agent definition and configuration
 """
+import copy
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import List, Dict, Any
 
+# The mock token accounting never varies, so every invoke result shares
+# one read-only dict and one empty tuple instead of fresh allocations
+_STATIC_TOKENS = MappingProxyType({"prompt": 100, "completion": 50})
+_NO_TOOLS: tuple = ()
+
+# Optional semantic response cache (MeanCache-style): with NumPy and
+# sentence-transformers installed, near-duplicate queries are answered
+# from a small FIFO of normalized embeddings instead of re-running the
+# full processing pipeline
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+
+    _EMBED_MODEL = SentenceTransformer("all-MiniLM-L6-v2")
+except ImportError:
+    _EMBED_MODEL = None
+
+_SEMANTIC_CACHE_SIZE = 128
+_SEMANTIC_CACHE_THRESHOLD = 0.92
+
+# Intent type → tool name, constant for the process lifetime
+_TOOL_MAP = {
+    "weather": "get_current_weather",
+    "time": "get_current_datetime",
+    "calculator": "calculate"
+}
+
+# Intent keywords compiled once at import time. With pyahocorasick
+# installed a single DFA pass over the input returns every matched
+# intent at once; otherwise fall back to plain substring scans.
+_INTENT_KEYWORDS = {
+    "hello": "greet", "hi": "greet", "hey": "greet",
+    "weather": "weather",
+    "time": "time", "date": "time", "clock": "time",
+    "calculate": "calc", "math": "calc", "compute": "calc",
+    "+": "calc", "-": "calc", "*": "calc", "/": "calc",
+    "help": "help",
+}
+
+try:
+    import ahocorasick
+
+    _AC = ahocorasick.Automaton()
+    for _keyword, _intent in _INTENT_KEYWORDS.items():
+        _AC.add_word(_keyword, _intent)
+    _AC.make_automaton()
+
+    def _detect_intents(text: str) -> set:
+        """Single linear DFA pass over the input"""
+        return {intent for _, intent in _AC.iter(text)}
+
+except ImportError:
+    # Fallback: a single compiled regex union with one named group per
+    # intent — one C-level pass instead of a substring scan per keyword
+    _INTENT_RE = re.compile(
+        r"(?P<greet>hello|hi|hey)"
+        r"|(?P<weather>weather)"
+        r"|(?P<time>time|date|clock)"
+        r"|(?P<calc>calculate|math|compute|[+\-*/])"
+        r"|(?P<help>help)"
+    )
+
+    def _detect_intents(text: str) -> set:
+        """Single regex pass over the input"""
+        return {match.lastgroup for match in _INTENT_RE.finditer(text)}
+
 
 class ADKAgent:
     """
@@ -15,20 +87,54 @@ class ADKAgent:
     - Planning: Decides which tools to use
     """
     
-    def __init__(self, 
+    def __init__(self,
                  name: str = "adk-agent",
                  model: str = "gemini-pro",
                  tools: List[Any] = None,
-                 system_prompt: str = None):
+                 system_prompt: str = None,
+                 max_history: int = None):
         self.name = name
         self.model = model
-        self.tools = tools or []
+        # Copy into a list: callers may pass the shared tool-singleton
+        # tuple from get_all_tools(), and add_tool must stay able to
+        # append without mutating state shared across agents
+        self.tools = list(tools) if tools else []
         self.system_prompt = system_prompt or "You are a helpful AI assistant."
-        self.memory = []
+        # Memory is stored struct-of-arrays: two parallel deques instead
+        # of one dict per turn. A bounded max_history makes truncation O(1).
+        self._roles = deque(maxlen=max_history)
+        self._contents = deque(maxlen=max_history)
+        # Cached get_memory snapshot, invalidated on every write
+        self._memory_snapshot = None
+        # FIFO semantic cache: parallel deques of embeddings and responses
+        self._cache_keys = deque(maxlen=_SEMANTIC_CACHE_SIZE)
+        self._cache_vals = deque(maxlen=_SEMANTIC_CACHE_SIZE)
+        # Tool calls are I/O-bound mocks, so independent intents in one
+        # message can be dispatched concurrently
+        self._pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("TOOL_CONCURRENCY_LIMIT", "4"))
+        )
         
     def add_tool(self, tool):
         """Add a tool to the agent"""
         self.tools.append(tool)
+
+    def clone(self, **overrides) -> "ADKAgent":
+        """
+        Create a new agent from this one as a template
+
+        Shares the tools list and thread pool; per-agent mutable state
+        (memory, caches) starts fresh. Keyword overrides replace
+        attributes on the clone, e.g. clone(name=..., system_prompt=...).
+        """
+        new = copy.copy(self)
+        new._roles = deque(maxlen=self._roles.maxlen)
+        new._contents = deque(maxlen=self._contents.maxlen)
+        new._memory_snapshot = None
+        new._cache_keys = deque(maxlen=_SEMANTIC_CACHE_SIZE)
+        new._cache_vals = deque(maxlen=_SEMANTIC_CACHE_SIZE)
+        new.__dict__.update(overrides)
+        return new
         
     def invoke(self, user_input: str) -> Dict[str, Any]:
         """
@@ -40,58 +146,140 @@ class ADKAgent:
         3. Execute tools
         4. Return final response
         """
-        self.memory.append({"role": "user", "content": user_input})
-        
-        # Mock LLM processing
-        response = self._process_input(user_input)
-        
-        self.memory.append({"role": "assistant", "content": response})
-        
+        self._roles.append("user")
+        self._contents.append(user_input)
+
+        # Semantically similar queries short-circuit to the cached answer
+        embedding, cached = self._semantic_lookup(user_input)
+        if cached is not None:
+            response = cached
+        else:
+            # Mock LLM processing
+            response = self._process_input(user_input)
+            if embedding is not None:
+                self._cache_keys.append(embedding)
+                self._cache_vals.append(response)
+
+        self._roles.append("assistant")
+        self._contents.append(response)
+        self._memory_snapshot = None
+
         return {
             "output": response,
-            "tools_used": [],
-            "token_usage": {"prompt": 100, "completion": 50}
+            "tools_used": _NO_TOOLS,
+            "token_usage": _STATIC_TOKENS
         }
-    
+
+    def invoke_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process a batch of inputs in one pass
+
+        Computes every response first, then writes the whole batch into
+        memory with a single extend per deque instead of two appends per
+        turn. A real ADK backend would also batch the LLM calls here.
+        """
+        responses = [self._process_input(query) for query in queries]
+
+        interleaved = [None] * (2 * len(queries))
+        interleaved[0::2] = queries
+        interleaved[1::2] = responses
+        self._roles.extend(("user", "assistant") * len(queries))
+        self._contents.extend(interleaved)
+        self._memory_snapshot = None
+
+        return [
+            {
+                "output": response,
+                "tools_used": _NO_TOOLS,
+                "token_usage": _STATIC_TOKENS
+            }
+            for response in responses
+        ]
+
+
+    def _semantic_lookup(self, user_input: str) -> tuple:
+        """
+        Look up the query in the semantic cache
+
+        Returns (embedding, cached_response). Both are None when the
+        embedding model is unavailable; cached_response is None on miss.
+        """
+        if _EMBED_MODEL is None:
+            return None, None
+
+        embedding = _EMBED_MODEL.encode(user_input)
+        embedding = embedding / np.linalg.norm(embedding)
+
+        if self._cache_keys:
+            # One dense matmul against all cached keys
+            sims = np.vstack(self._cache_keys) @ embedding
+            best = int(sims.argmax())
+            if sims[best] > _SEMANTIC_CACHE_THRESHOLD:
+                return embedding, self._cache_vals[best]
+
+        return embedding, None
+
     def _process_input(self, user_input: str) -> str:
         """Mock processing logic"""
         user_lower = user_input.lower()
-        
-        # Simple intent detection
-        if any(word in user_lower for word in ["hello", "hi", "hey"]):
+
+        # Simple intent detection: one pass returns all matched intents
+        intents = _detect_intents(user_lower)
+
+        if "greet" in intents:
             return f"Hello! I'm {self.name}. How can I help you today?"
-        
-        elif "weather" in user_lower:
-            return self._use_tool("weather", user_input)
-        
-        elif any(word in user_lower for word in ["time", "date", "clock"]):
-            return self._use_tool("time", user_input)
-        
-        elif any(word in user_lower for word in ["calculate", "math", "compute", "+", "-", "*", "/"]):
-            return self._use_tool("calculator", user_input)
-        
-        elif "help" in user_lower:
+
+        # Collect all tool intents so independent calls run concurrently
+        tool_calls = []
+        if "weather" in intents:
+            tool_calls.append(("weather", user_input))
+        if "time" in intents:
+            tool_calls.append(("time", user_input))
+        if "calc" in intents:
+            tool_calls.append(("calculator", user_input))
+
+        if tool_calls:
+            return "\n".join(self._dispatch_tools(tool_calls))
+
+        elif "help" in intents:
             tools_list = ", ".join([t.name for t in self.tools])
             return f"I can help you with various tasks. Available tools: {tools_list}"
-        
+
         else:
             return f"I understand you said: '{user_input}'. How can I assist you further?"
+
+    def _dispatch_tools(self, tool_calls: List[tuple]) -> List[str]:
+        """Run detected tool calls, in parallel when there is more than one"""
+        def safe_call(call):
+            tool_type, input_data = call
+            try:
+                return self._use_tool(tool_type, input_data)
+            except Exception as e:
+                return f"[Tool error: {tool_type}] {e}"
+
+        if len(tool_calls) == 1:
+            return [safe_call(tool_calls[0])]
+
+        return list(self._pool.map(safe_call, tool_calls))
     
     def _use_tool(self, tool_type: str, input_data: str) -> str:
         """Simulate tool usage"""
-        tool_map = {
-            "weather": "get_current_weather",
-            "time": "get_current_datetime", 
-            "calculator": "calculate"
-        }
-        
-        tool_name = tool_map.get(tool_type, "unknown")
+        tool_name = _TOOL_MAP.get(tool_type, "unknown")
         return f"[Using tool: {tool_name}] I would process your request about '{input_data[:30]}...'"
     
     def get_memory(self) -> List[Dict[str, str]]:
         """Retrieve conversation memory"""
-        return self.memory.copy()
-    
+        # Build the dict view lazily and reuse it until the next write;
+        # repeated reads cost O(1) instead of a full list copy
+        if self._memory_snapshot is None:
+            self._memory_snapshot = tuple(
+                {"role": role, "content": content}
+                for role, content in zip(self._roles, self._contents)
+            )
+        return self._memory_snapshot
+
     def clear_memory(self):
         """Clear conversation history"""
-        self.memory = []
+        self._roles.clear()
+        self._contents.clear()
+        self._memory_snapshot = None
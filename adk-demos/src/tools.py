@@ -4,58 +4,149 @@ Custom Tools for ADK Agent
 Tools are functions that agents can call to perform specific tasks.
 They extend the capabilities of the LLM beyond text generation.
 """
+import functools
 import json
 import random
+import time
 from datetime import datetime
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 
+# numexpr parses an expression once into a vectorized program; without it
+# we fall back to caching the compiled code object for plain eval()
+try:
+    import numexpr
+
+    @functools.lru_cache(maxsize=1024)
+    def _compile_expression(expression: str):
+        return numexpr.NumExpr(expression)
+
+    def _evaluate_expression(expression: str):
+        return _compile_expression(expression)().item()
+
+except ImportError:
+    @functools.lru_cache(maxsize=1024)
+    def _compile_expression(expression: str):
+        return compile(expression, "<calculator>", "eval")
+
+    def _evaluate_expression(expression: str):
+        # SECURITY WARNING: In production, use a safe evaluation library
+        # like numexpr or ast.literal_eval instead of eval()
+        # This is just for demo purposes
+        return eval(_compile_expression(expression))
+
+# Pre-drawn pools of random integers: one vectorized NumPy draw amortizes
+# the RNG cost over thousands of tool calls; without NumPy fall back to
+# per-call random
+try:
+    import numpy as _np
+
+    _rng = _np.random.default_rng()
+    _POOL_SIZE = 4096
+
+    def _int_pool(low: int, high: int):
+        """Endless iterator over batched integer draws in [low, high]"""
+        while True:
+            for value in _rng.integers(low, high + 1, size=_POOL_SIZE).tolist():
+                yield value
+
+except ImportError:
+    def _int_pool(low: int, high: int):
+        while True:
+            yield random.randint(low, high)
+
+_WEATHER_CONDITIONS = ("Sunny", "Cloudy", "Rainy", "Partly Cloudy", "Snowy")
+_TEMP_POOL = _int_pool(-5, 35)
+_CONDITION_POOL = _int_pool(0, len(_WEATHER_CONDITIONS) - 1)
+
+# strftime is costly and the display format only has second resolution,
+# so cache the rendered string for the current wall-clock second.
+# Bind the clock function here so later rebindings of the module-global
+# name `time` (e.g. in scripts using it as a variable) can't break it
+_time_fn = time.time
+_last_sec = 0
+_last_str = ""
+
+
+def _current_datetime_str() -> str:
+    global _last_sec, _last_str
+    sec = int(_time_fn())
+    if sec != _last_sec:
+        _last_sec = sec
+        _last_str = datetime.fromtimestamp(sec).strftime('%Y-%m-%d %H:%M:%S')
+    return _last_str
+
+
+# Deletion table for the calculator whitelist: translating an expression
+# through it strips every allowed character, so any residue is invalid
+_ALLOWED_CHARS_TABLE = str.maketrans("", "", "0123456789+-*/(). sqrt")
+
 
 class Tool:
     """Base class for ADK tools"""
-    
+
+    __slots__ = ("name", "description", "parameters", "_dict", "_json")
+
     def __init__(self, name: str, description: str, parameters: Dict[str, Any] = None):
         self.name = name
         self.description = description
-        self.parameters = parameters or {}
-    
+        self.parameters = parameters if parameters is not None else {}
+        # The definition never changes after construction, so build the
+        # dict once and hand out a read-only view (the parameters copy
+        # keeps the view JSON-serializable even for shared schemas)
+        self._dict = MappingProxyType({
+            "name": self.name,
+            "description": self.description,
+            "parameters": dict(self.parameters)
+        })
+        self._json = None
+
+    @property
+    def json(self) -> str:
+        """JSON schema string, serialized once on first access"""
+        if self._json is None:
+            self._json = json.dumps(dict(self._dict), indent=2)
+        return self._json
+
     def __call__(self, **kwargs) -> str:
         """Execute the tool with given parameters"""
         raise NotImplementedError("Subclasses must implement __call__")
-    
+
     def to_dict(self) -> Dict[str, Any]:
-        """Convert tool definition to dictionary"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "parameters": self.parameters
-        }
+        """Convert tool definition to dictionary (read-only view)"""
+        return self._dict
 
 
 class WeatherTool(Tool):
     """Tool to get weather information"""
-    
+
+    __slots__ = ()
+
+    # Schema is identical for every instance, so share one read-only copy
+    PARAMETERS = MappingProxyType({
+        "location": {
+            "type": "string",
+            "description": "The city and state, e.g., San Francisco, CA"
+        },
+        "unit": {
+            "type": "string",
+            "enum": ["celsius", "fahrenheit"],
+            "description": "Temperature unit"
+        }
+    })
+
     def __init__(self):
         super().__init__(
             name="get_current_weather",
             description="Get the current weather for a specific location",
-            parameters={
-                "location": {
-                    "type": "string",
-                    "description": "The city and state, e.g., San Francisco, CA"
-                },
-                "unit": {
-                    "type": "string",
-                    "enum": ["celsius", "fahrenheit"],
-                    "description": "Temperature unit"
-                }
-            }
+            parameters=self.PARAMETERS
         )
     
     def __call__(self, location: str, unit: str = "celsius") -> str:
         """Mock weather data"""
         # In real implementation, this would call a weather API
-        temp = random.randint(-5, 35)
-        conditions = random.choice(["Sunny", "Cloudy", "Rainy", "Partly Cloudy", "Snowy"])
+        temp = next(_TEMP_POOL)
+        conditions = _WEATHER_CONDITIONS[next(_CONDITION_POOL)]
         
         if unit == "fahrenheit":
             temp = int(temp * 9/5 + 32)
@@ -68,54 +159,56 @@ class WeatherTool(Tool):
 
 class TimeTool(Tool):
     """Tool to get current date and time"""
-    
+
+    __slots__ = ()
+
+    PARAMETERS = MappingProxyType({
+        "timezone": {
+            "type": "string",
+            "description": "Timezone (e.g., 'UTC', 'America/New_York')",
+            "default": "UTC"
+        }
+    })
+
     def __init__(self):
         super().__init__(
             name="get_current_datetime",
             description="Get the current date and time",
-            parameters={
-                "timezone": {
-                    "type": "string",
-                    "description": "Timezone (e.g., 'UTC', 'America/New_York')",
-                    "default": "UTC"
-                }
-            }
+            parameters=self.PARAMETERS
         )
     
     def __call__(self, timezone: str = "UTC") -> str:
         """Get current datetime"""
-        now = datetime.now()
-        return f"Current datetime ({timezone}): {now.strftime('%Y-%m-%d %H:%M:%S')}"
+        return f"Current datetime ({timezone}): {_current_datetime_str()}"
 
 
 class CalculatorTool(Tool):
     """Tool to perform calculations"""
-    
+
+    __slots__ = ()
+
+    PARAMETERS = MappingProxyType({
+        "expression": {
+            "type": "string",
+            "description": "Mathematical expression to evaluate, e.g., '15 * 23' or 'sqrt(16)'"
+        }
+    })
+
     def __init__(self):
         super().__init__(
             name="calculate",
             description="Perform mathematical calculations",
-            parameters={
-                "expression": {
-                    "type": "string",
-                    "description": "Mathematical expression to evaluate, e.g., '15 * 23' or 'sqrt(16)'"
-                }
-            }
+            parameters=self.PARAMETERS
         )
     
     def __call__(self, expression: str) -> str:
         """Evaluate mathematical expression"""
         try:
-            # SECURITY WARNING: In production, use a safe evaluation library
-            # like numexpr or ast.literal_eval instead of eval()
-            # This is just for demo purposes
-            
             # Basic whitelist of allowed operations
-            allowed_chars = set("0123456789+-*/(). sqrt")
-            if not all(c in allowed_chars for c in expression.replace(" ", "")):
+            if expression.translate(_ALLOWED_CHARS_TABLE):
                 return f"Error: Invalid characters in expression. Only basic math operations allowed."
-            
-            result = eval(expression)
+
+            result = _evaluate_expression(expression)
             return f"{expression} = {result}"
         except Exception as e:
             return f"Error calculating '{expression}': {str(e)}"
@@ -123,22 +216,26 @@ class CalculatorTool(Tool):
 
 class SearchTool(Tool):
     """Tool to search for information (mock implementation)"""
-    
+
+    __slots__ = ()
+
+    PARAMETERS = MappingProxyType({
+        "query": {
+            "type": "string",
+            "description": "Search query"
+        },
+        "limit": {
+            "type": "integer",
+            "description": "Number of results to return",
+            "default": 5
+        }
+    })
+
     def __init__(self):
         super().__init__(
             name="search",
             description="Search for information on the internet",
-            parameters={
-                "query": {
-                    "type": "string",
-                    "description": "Search query"
-                },
-                "limit": {
-                    "type": "integer",
-                    "description": "Number of results to return",
-                    "default": 5
-                }
-            }
+            parameters=self.PARAMETERS
         )
     
     def __call__(self, query: str, limit: int = 5) -> str:
@@ -153,14 +250,19 @@ class SearchTool(Tool):
         return f"Search results for '{query}':\n" + "\n".join(mock_results[:limit])
 
 
-def get_all_tools() -> list:
+# Tools are stateless, so a single set of instances is shared by every
+# caller instead of reconstructing the four tools per agent
+_TOOL_SINGLETONS = (
+    WeatherTool(),
+    TimeTool(),
+    CalculatorTool(),
+    SearchTool()
+)
+
+
+def get_all_tools() -> tuple:
     """Factory function to get all available tools"""
-    return [
-        WeatherTool(),
-        TimeTool(),
-        CalculatorTool(),
-        SearchTool()
-    ]
+    return _TOOL_SINGLETONS
 
 
 # Example usage
@@ -171,16 +273,16 @@ if __name__ == "__main__":
     
     # Create tools
     weather = WeatherTool()
-    time = TimeTool()
+    time_tool = TimeTool()
     calculator = CalculatorTool()
-    
+
     # Test weather tool
     print("\n1. Weather Tool:")
     print(weather(location="New York, NY", unit="fahrenheit"))
-    
+
     # Test time tool
     print("\n2. Time Tool:")
-    print(time(timezone="UTC"))
+    print(time_tool(timezone="UTC"))
     
     # Test calculator tool
     print("\n3. Calculator Tool:")
@@ -192,6 +294,6 @@ if __name__ == "__main__":
     tools = get_all_tools()
     for tool in tools:
         print(f"\n{tool.name}:")
-        print(json.dumps(tool.to_dict(), indent=2))
+        print(tool.json)
     
     print("\n" + "=" * 60)
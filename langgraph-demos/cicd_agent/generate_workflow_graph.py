@@ -3,7 +3,9 @@
 Generate workflow visualization for the CI/CD Agent
 """
 from graphviz import Digraph
+import hashlib
 import os
+import subprocess
 
 def create_workflow_graph(output_dir='.'):
     """Create a visual workflow diagram"""
@@ -104,29 +106,37 @@ def create_workflow_graph(output_dir='.'):
     
     # Save files
     os.makedirs(output_dir, exist_ok=True)
-    
-    # Try to render images (requires graphviz binary)
-    try:
-        # Save as PNG
-        png_path = os.path.join(output_dir, 'cicd_workflow')
-        dot.render(png_path, format='png', cleanup=False)
-        print(f"✓ Generated: {png_path}.png")
-        
-        # Save as SVG
-        svg_path = os.path.join(output_dir, 'cicd_workflow')
-        dot.render(svg_path, format='svg', cleanup=False)
-        print(f"✓ Generated: {svg_path}.svg")
-    except Exception as e:
-        print(f"⚠️  Could not render images (graphviz binary not found)")
-        print(f"   Error: {e}")
-        print(f"   Install graphviz from: https://graphviz.org/download/")
-    
-    # Save as DOT source (always works)
+
+    # Save as DOT source first (always works)
     dot_path = os.path.join(output_dir, 'cicd_workflow.dot')
     with open(dot_path, 'w') as f:
         f.write(dot.source)
     print(f"✓ Generated: {dot_path}")
-    
+
+    # Try to render images (requires graphviz binary). A single dot
+    # invocation with two -T flags parses the source once and emits both
+    # formats, instead of one subprocess + re-serialization per format.
+    try:
+        subprocess.run(["dot", "-Tpng", "-Tsvg", "-O", dot_path], check=True)
+        for fmt in ("png", "svg"):
+            # dot -O names outputs after the input file (.dot.png etc.)
+            os.replace(f"{dot_path}.{fmt}",
+                       os.path.join(output_dir, f"cicd_workflow.{fmt}"))
+            print(f"✓ Generated: {os.path.join(output_dir, 'cicd_workflow.' + fmt)}")
+    except (FileNotFoundError, subprocess.CalledProcessError, OSError):
+        # Fall back to graphviz's pipe(), which streams rendered bytes
+        # straight back instead of render()'s temp-file round trip
+        try:
+            for fmt in ("png", "svg"):
+                out_path = os.path.join(output_dir, f"cicd_workflow.{fmt}")
+                with open(out_path, 'wb') as f:
+                    f.write(dot.pipe(format=fmt))
+                print(f"✓ Generated: {out_path}")
+        except Exception as e:
+            print(f"⚠️  Could not render images (graphviz binary not found)")
+            print(f"   Error: {e}")
+            print(f"   Install graphviz from: https://graphviz.org/download/")
+
     return dot
 
 
@@ -178,9 +188,19 @@ graph TD
     class PREP,REL_DOCKER,REL_HELM,REL_TF release
 ```'''
     
+    # Skip the write when the on-disk content is already identical, so
+    # repeated CI runs do not dirty mtimes and downstream build caches
+    new_digest = hashlib.blake2b(mermaid_code.encode(), digest_size=16).digest()
+    if os.path.exists(output_path):
+        with open(output_path, 'rb') as f:
+            old_digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+        if old_digest == new_digest:
+            print(f"✓ Up to date: {output_path}")
+            return mermaid_code
+
     with open(output_path, 'w') as f:
         f.write(mermaid_code)
-    
+
     print(f"✓ Generated: {output_path}")
     return mermaid_code
 
@@ -1,20 +1,41 @@
+import asyncio
+
 from langgraph.graph import StateGraph, START, END
-from ..state import CICDState, create_initial_state
+from langgraph.constants import Send
+from ..state import CICDState, FixAttempt, create_initial_state
 from .discovery import discover_files
-from .validators import validate_terraform, validate_docker, validate_helm
+from .validators import plan_validation_units, reset_validation_round, validate_unit
 from .fixers import fix_terraform, fix_docker, fix_helm
-from .decision import collect_errors, decide_next_action, prepare_release, fail_workflow
+from .decision import check_skip, collect_errors, decide_next_action, prepare_release, fail_workflow
 from .release import release_docker, release_helm, release_terraform
 
 
+def route_validations(state: CICDState):
+    """Fan out one Send per (tool, target) unit for true node parallelism
+
+    Empty file types contribute zero units, so their validators never
+    enter the scheduler at all; with no units the graph jumps straight
+    to collect_errors.
+    """
+    units = plan_validation_units(state)
+    if not units:
+        return "collect_errors"
+    return [Send("validate_unit", unit) for unit in units]
+
+
+def route_skip(state: CICDState) -> str:
+    """Skip straight to END when check_skip matched the last run"""
+    return "skip" if state.get("status") == "skipped" else "validate"
+
+
 def build_cicd_graph():
     workflow = StateGraph(CICDState)
-    
+
     # Add nodes
     workflow.add_node("discover", discover_files)
-    workflow.add_node("validate_terraform", validate_terraform)
-    workflow.add_node("validate_docker", validate_docker)
-    workflow.add_node("validate_helm", validate_helm)
+    workflow.add_node("check_skip", check_skip)
+    workflow.add_node("dispatch_validations", reset_validation_round)
+    workflow.add_node("validate_unit", validate_unit)
     workflow.add_node("collect_errors", collect_errors)
     workflow.add_node("decide", decide_next_action)
     workflow.add_node("fix_terraform", fix_terraform)
@@ -25,20 +46,30 @@ def build_cicd_graph():
     workflow.add_node("release_helm", release_helm)
     workflow.add_node("release_terraform", release_terraform)
     workflow.add_node("fail", fail_workflow)
-    
+
     # Add edges
     workflow.add_edge(START, "discover")
-    
-    # Parallel validation
-    workflow.add_edge("discover", "validate_terraform")
-    workflow.add_edge("discover", "validate_docker")
-    workflow.add_edge("discover", "validate_helm")
-    
-    # After all validations
-    workflow.add_edge("validate_terraform", "collect_errors")
-    workflow.add_edge("validate_docker", "collect_errors")
-    workflow.add_edge("validate_helm", "collect_errors")
-    
+
+    # Unchanged file set since the last successful run ends the graph
+    # immediately with that run's stored release results
+    workflow.add_edge("discover", "check_skip")
+    workflow.add_conditional_edges(
+        "check_skip",
+        route_skip,
+        {
+            "validate": "dispatch_validations",
+            "skip": END
+        }
+    )
+
+    # Parallel validation: each tool x target pair is its own node
+    workflow.add_conditional_edges(
+        "dispatch_validations",
+        route_validations,
+        ["validate_unit", "collect_errors"]
+    )
+    workflow.add_edge("validate_unit", "collect_errors")
+
     # Decision point
     workflow.add_edge("collect_errors", "decide")
     
@@ -57,8 +88,8 @@ def build_cicd_graph():
     workflow.add_edge("fix_terraform", "fix_docker")
     workflow.add_edge("fix_docker", "fix_helm")
     
-    # After fixes, loop back to validation
-    workflow.add_edge("fix_helm", "validate_terraform")
+    # After fixes, loop back to a fresh validation fan-out
+    workflow.add_edge("fix_helm", "dispatch_validations")
     
     # Release chain
     workflow.add_edge("prepare_release", "release_docker")
@@ -72,18 +103,19 @@ def build_cicd_graph():
     return workflow.compile()
 
 
+# Building and compiling the StateGraph is non-trivial; the compiled
+# graph holds no per-run state, so do it once at import and reuse it
+_COMPILED_GRAPH = build_cicd_graph()
+
 def run_cicd_agent(user_paths: list, max_fix_attempts: int = 3):
-    graph = build_cicd_graph()
     initial_state = create_initial_state(user_paths)
-    
+
     # Set max attempts
-    for ft in ["terraform", "docker", "helm"]:
-        initial_state["fix_attempts"][ft] = {
-            "file_type": ft,
-            "attempts": 0,
-            "max_attempts": max_fix_attempts,
-            "last_fix_time": None
-        }
-    
-    result = graph.invoke(initial_state)
+    initial_state["fix_attempts"] = {
+        ft: FixAttempt(ft, max_attempts=max_fix_attempts)
+        for ft in ("terraform", "docker", "helm")
+    }
+
+    # The validators are async nodes, so drive the graph with ainvoke
+    result = asyncio.run(_COMPILED_GRAPH.ainvoke(initial_state))
     return result
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse
+import logging
 import sys
 from .graph import run_cicd_agent
 
@@ -22,9 +23,23 @@ def main():
         action='store_true',
         help='Run validations only, skip release'
     )
-    
+    parser.add_argument(
+        '--log-level',
+        default='INFO',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        help='Logging verbosity (default: INFO)'
+    )
+
     args = parser.parse_args()
-    
+
+    # Nodes log lazily via logging; at WARNING and above the per-file
+    # progress messages are never even formatted
+    logging.basicConfig(
+        level=args.log_level,
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+        stream=sys.stderr
+    )
+
     print("=" * 60)
     print("CI/CD Agent - Terraform | Docker | Helm")
     print("=" * 60)
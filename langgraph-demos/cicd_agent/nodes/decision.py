@@ -1,56 +1,92 @@
+import logging
+
 from ..state import CICDState
+from ..utils import cache
+
+logger = logging.getLogger(__name__)
+
+
+def check_skip(state: CICDState) -> CICDState:
+    """Short-circuit the run when the discovered file set is unchanged
+
+    Compares a stat-based signature of every discovered file against
+    the one recorded after the last successful release. On a match the
+    graph jumps straight to END with the stored release results.
+    """
+    file_hash = cache.file_set_hash(state["files"])
+    state["file_set_hash"] = file_hash
+
+    last_run = cache.get_last_run()
+    if last_run and file_hash and last_run.get("hash") == file_hash:
+        logger.info("No tracked files changed since last successful run — skipping")
+        state["release_results"] = last_run.get("release_results", {})
+        state["release_ready"] = True
+        state["status"] = "skipped"
+    return state
 
 
 def collect_errors(state: CICDState) -> CICDState:
+    # One sweep over the flat Send-fan-out results builds the per-type
+    # grouping, the error summaries, the per-file index, and the total
+    grouped = {"terraform": [], "docker": [], "helm": []}
     collected = {"terraform": [], "docker": [], "helm": []}
     errors_by_file = {}
-    
-    for file_type, results in state["validation_results"].items():
-        for result in results:
-            if not result["passed"]:
-                error_msg = f"[{result['tool']}] {result['file_path']}: {', '.join(result['errors'])}"
-                collected[file_type].append(error_msg)
-                
-                if result['file_path'] not in errors_by_file:
-                    errors_by_file[result['file_path']] = []
-                errors_by_file[result['file_path']].extend(result['errors'])
-    
+    total_errors = 0
+
+    for result in state["validation_results_flat"]:
+        file_type = result["file_type"]
+        grouped[file_type].append(result)
+        if result["passed"]:
+            continue
+        errors = result["errors"]
+        collected[file_type].append(
+            f"[{result['tool']}] {result['file_path']}: {', '.join(errors)}"
+        )
+        errors_by_file.setdefault(result["file_path"], []).extend(errors)
+        total_errors += 1
+
+    state["validation_results"] = grouped
     state["collected_errors"] = collected
     state["errors_by_file"] = errors_by_file
+    state["total_errors"] = total_errors
     state["all_validations_complete"] = True
-    
-    total_errors = sum(len(errs) for errs in collected.values())
-    print(f"\nValidation complete. Total errors found: {total_errors}")
+
+    logger.info("Validation complete. Total errors found: %d", total_errors)
     for ft, errs in collected.items():
         if errs:
-            print(f"  {ft}: {len(errs)} errors")
-    
+            logger.info("  %s: %d errors", ft, len(errs))
+
     return state
 
 
 def decide_next_action(state: CICDState) -> str:
-    total_errors = sum(len(errs) for errs in state["collected_errors"].values())
+    # collect_errors already counted during its single pass
+    total_errors = state["total_errors"]
     
     if total_errors == 0:
-        print("All validations passed! Proceeding to release...")
+        logger.info("All validations passed! Proceeding to release...")
         state["release_ready"] = True
         return "release"
-    
-    print(f"\nErrors found: {total_errors}")
+
+    logger.info("Errors found: %d", total_errors)
     
     # Check if we can attempt fixes
     needs_fix = False
     for file_type in ["terraform", "docker", "helm"]:
         errors = state["collected_errors"].get(file_type, [])
         if errors:
-            attempts = state["fix_attempts"].get(file_type, {}).get("attempts", 0)
-            max_attempts = state["fix_attempts"].get(file_type, {}).get("max_attempts", 3)
-            
+            attempt = state["fix_attempts"].get(file_type)
+            attempts = attempt.attempts if attempt else 0
+            max_attempts = attempt.max_attempts if attempt else 3
+
+
             if attempts < max_attempts:
-                print(f"  {file_type}: {len(errors)} errors, will attempt fix ({attempts + 1}/{max_attempts})")
+                logger.info("  %s: %d errors, will attempt fix (%d/%d)",
+                            file_type, len(errors), attempts + 1, max_attempts)
                 needs_fix = True
             else:
-                print(f"  {file_type}: {len(errors)} errors, max attempts reached")
+                logger.info("  %s: %d errors, max attempts reached",
+                            file_type, len(errors))
     
     if needs_fix:
         state["status"] = "fixing"
@@ -58,12 +94,12 @@ def decide_next_action(state: CICDState) -> str:
     else:
         state["status"] = "failed"
         state["error_message"] = f"Max fix attempts reached. Errors remain: {total_errors}"
-        print(f"\nFAILED: {state['error_message']}")
+        logger.error("FAILED: %s", state['error_message'])
         return "fail"
 
 
 def prepare_release(state: CICDState) -> CICDState:
-    print("\nPreparing for release...")
+    logger.info("Preparing for release...")
     state["release_ready"] = True
     state["status"] = "releasing"
     return state
@@ -71,12 +107,12 @@ def prepare_release(state: CICDState) -> CICDState:
 
 def fail_workflow(state: CICDState) -> CICDState:
     state["status"] = "failed"
-    print(f"\nWorkflow failed with errors:")
+    logger.error("Workflow failed with errors:")
     for ft, errs in state["collected_errors"].items():
         if errs:
-            print(f"\n{ft.upper()}:")
+            logger.error("%s:", ft.upper())
             for err in errs[:5]:
-                print(f"  - {err}")
+                logger.error("  - %s", err)
             if len(errs) > 5:
-                print(f"  ... and {len(errs) - 5} more errors")
+                logger.error("  ... and %d more errors", len(errs) - 5)
     return state
@@ -1,51 +1,100 @@
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict
 from ..state import CICDState
 
+logger = logging.getLogger(__name__)
 
-def is_terraform_file(file_path: str) -> bool:
-    return file_path.endswith(('.tf', '.tfvars'))
 
+# Classification tables: one lowercased basename feeds a set probe, a
+# suffix check, and a prefix check — no per-file helper calls
+_HELM_EXACT = frozenset({'chart.yaml', 'values.yaml', 'requirements.yaml'})
+_TERRAFORM_SUFFIXES = ('.tf', '.tfvars')
+_DOCKER_PREFIX = 'dockerfile'
 
-def is_docker_file(file_path: str) -> bool:
-    basename = os.path.basename(file_path).lower()
-    return basename.startswith('dockerfile') or 'docker-compose' in basename
 
+def _classify(lname: str, lpath: str) -> str:
+    """Map a lowercased basename/path to a file type, or None"""
+    if lname.endswith(_TERRAFORM_SUFFIXES):
+        return 'terraform'
+    if lname.startswith(_DOCKER_PREFIX) or 'docker-compose' in lname:
+        return 'docker'
+    if lname in _HELM_EXACT or '/templates/' in lpath:
+        return 'helm'
+    return None
 
-def is_helm_file(file_path: str) -> bool:
-    basename = os.path.basename(file_path)
-    helm_files = ['chart.yaml', 'values.yaml', 'requirements.yaml']
-    return basename.lower() in helm_files or '/templates/' in file_path.lower()
+
+def _scan_root(path: str) -> tuple:
+    """
+    Recursively scan one root with os.scandir
+
+    DirEntry caches the d_type from the directory listing, so the scan
+    avoids os.walk's extra stat per entry. Returns the per-root
+    (discovered, chart_index) so roots can be scanned concurrently.
+    """
+    discovered = {"terraform": [], "docker": [], "helm": []}
+    chart_index = set()
+
+    def scan(directory):
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            return
+        with entries:
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.') and entry.name != 'node_modules':
+                        subdirs.append(entry.path)
+                    continue
+
+                # Index chart roots during the same scan so downstream
+                # nodes resolve charts with set lookups, not stat probes
+                if entry.name == "Chart.yaml":
+                    chart_index.add(directory)
+
+                file_type = _classify(entry.name.lower(), entry.path.lower())
+                if file_type:
+                    discovered[file_type].append(entry.path)
+
+        for subdir in subdirs:
+            scan(subdir)
+
+    scan(path)
+    return discovered, chart_index
 
 
 def discover_files(state: CICDState) -> CICDState:
     user_paths = state["user_paths"]
     discovered = {"terraform": [], "docker": [], "helm": []}
-    
+    chart_index = set()
+
+    roots = []
     for path in user_paths:
         if not os.path.exists(path):
-            print(f"Warning: Path does not exist: {path}")
+            logger.warning("Path does not exist: %s", path)
             continue
-            
-        for root, dirs, files in os.walk(path):
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
-            
-            for file in files:
-                full_path = os.path.join(root, file)
-                
-                if is_terraform_file(full_path):
-                    discovered["terraform"].append(full_path)
-                elif is_docker_file(full_path):
-                    discovered["docker"].append(full_path)
-                elif is_helm_file(full_path):
-                    discovered["helm"].append(full_path)
-    
-    state["files"] = discovered
-    
-    print(f"Discovered files:")
-    print(f"  Terraform: {len(discovered['terraform'])} files")
-    print(f"  Docker: {len(discovered['docker'])} files")
-    print(f"  Helm: {len(discovered['helm'])} files")
+        roots.append(path)
+
+    # Roots live on independent disks/mounts often enough that scanning
+    # them concurrently hides I/O latency
+    if roots:
+        with ThreadPoolExecutor(max_workers=min(32, len(roots) * 4)) as executor:
+            for root_discovered, root_charts in executor.map(_scan_root, roots):
+                for file_type, paths in root_discovered.items():
+                    discovered[file_type].extend(paths)
+                chart_index |= root_charts
+
+    # Freeze as tuples: downstream nodes only iterate these, and the
+    # Pregel merge can share the references instead of copying lists
+    state["files"] = {ft: tuple(paths) for ft, paths in discovered.items()}
+    state["chart_index"] = tuple(sorted(chart_index))
     
+    logger.info("Discovered files:")
+    logger.info("  Terraform: %d files", len(discovered['terraform']))
+    logger.info("  Docker: %d files", len(discovered['docker']))
+    logger.info("  Helm: %d files", len(discovered['helm']))
+
     return state
@@ -1,152 +1,199 @@
+import logging
+import mmap
 import os
 import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict
 from ..state import CICDState, FixAttempt
+from ..utils.helm import find_chart_dirs
+
+logger = logging.getLogger(__name__)
+
+# One anchored match per line replaces four substring scans plus the
+# split/replace allocation chain; group 2 tells us if a tag is pinned
+_FROM_RE = re.compile(r'^\s*FROM\s+(python|node|ubuntu|alpine)(:\S+)?')
+_IMAGE_MAP = {
+    'python': 'python:3.11-slim',
+    'node': 'node:20-alpine',
+    'ubuntu': 'ubuntu:22.04',
+    'alpine': 'alpine:3.18',
+}
+
+# Anchored at line start so provider mentions inside strings or nested
+# blocks are left alone; sub with count=1 inserts the block exactly once
+_PROVIDER_RE = re.compile(r'(?m)^provider\s+"')
+_PROVIDER_BLOCK = ('terraform {\n  required_providers {\n'
+                   '    # Providers will be auto-detected\n  }\n}\n\nprovider "')
 
 
 def get_or_create_fix_attempt(state: CICDState, file_type: str) -> FixAttempt:
     if file_type not in state["fix_attempts"]:
-        state["fix_attempts"][file_type] = {
-            "file_type": file_type,
-            "attempts": 0,
-            "max_attempts": 3,
-            "last_fix_time": None
-        }
+        state["fix_attempts"][file_type] = FixAttempt(file_type)
     return state["fix_attempts"][file_type]
 
 
 def can_attempt_fix(state: CICDState, file_type: str) -> bool:
-    attempt = get_or_create_fix_attempt(state, file_type)
-    return attempt["attempts"] < attempt["max_attempts"]
+    # Pure query: checking must not write a FixAttempt into state; the
+    # entry is created lazily by increment_fix_attempt when a fix runs
+    attempt = state["fix_attempts"].get(file_type)
+    return attempt is None or attempt.attempts < attempt.max_attempts
 
 
 def increment_fix_attempt(state: CICDState, file_type: str):
     attempt = get_or_create_fix_attempt(state, file_type)
-    attempt["attempts"] += 1
-    attempt["last_fix_time"] = datetime.now().isoformat()
+    attempt.attempts += 1
+    attempt.last_fix_time = datetime.now().isoformat()
 
 
 def fix_terraform(state: CICDState) -> CICDState:
     if not can_attempt_fix(state, "terraform"):
-        print("Max fix attempts reached for Terraform")
+        logger.info("Max fix attempts reached for Terraform")
         return state
     
     files = state["files"]["terraform"]
     if not files:
         return state
     
-    print(f"Attempting to fix Terraform files (attempt {state['fix_attempts']['terraform']['attempts'] + 1}/3)")
+    logger.info("Attempting to fix Terraform files (attempt %d/3)",
+                get_or_create_fix_attempt(state, "terraform").attempts + 1)
     
-    tf_dirs = set(os.path.dirname(f) for f in files)
-    
-    for tf_dir in tf_dirs:
-        # terraform fmt
-        import subprocess
-        subprocess.run(["terraform", "fmt", "-recursive"], cwd=tf_dir, capture_output=True)
-        
-        # Fix provider version constraints
-        for root, dirs, files in os.walk(tf_dir):
-            for file in files:
-                if file.endswith('.tf'):
-                    file_path = os.path.join(root, file)
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                    
-                    # Add required_providers block if missing
-                    if 'required_providers' not in content and 'provider ' in content:
-                        content = content.replace(
-                            'provider "',
-                            'terraform {\n  required_providers {\n    # Providers will be auto-detected\n  }\n}\n\nprovider "'
-                        )
-                    
-                    with open(file_path, 'w') as f:
-                        f.write(content)
+    tf_dirs = {os.path.dirname(f) for f in files}
+
+    # terraform fmt invocations are isolated processes; launch them all
+    # concurrently instead of paying each startup and format serially
+    with ThreadPoolExecutor(max_workers=min(8, len(tf_dirs))) as executor:
+        list(executor.map(
+            lambda tf_dir: subprocess.run(["terraform", "fmt", "-recursive"],
+                                          cwd=tf_dir, capture_output=True),
+            tf_dirs
+        ))
+
+    # Fix provider version constraints. Discovery already enumerated
+    # every .tf file, so no need to re-walk (and re-stat) the trees
+    for file_path in files:
+        if not file_path.endswith('.tf'):
+            continue
+
+        # Scan the raw bytes via mmap first: the already-compliant case
+        # needs no decode, no str allocation, and — crucially — no write
+        try:
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                needs_fix = (mm.find(b'required_providers') < 0
+                             and mm.find(b'provider ') >= 0)
+        except (OSError, ValueError):  # unreadable or empty file
+            continue
+
+        if not needs_fix:
+            continue
+
+        with open(file_path, 'r') as f:
+            content = f.read()
+
+        # Add required_providers block above the first provider block
+        content, subs = _PROVIDER_RE.subn(_PROVIDER_BLOCK, content, count=1)
+        if not subs:
+            continue
+
+        with open(file_path, 'w') as f:
+            f.write(content)
     
     increment_fix_attempt(state, "terraform")
-    state["files_fixed"].extend(files)
+    state["files_fixed"].update(dict.fromkeys(files))
     state["fix_applied"] = True
-    print(f"Fixed {len(files)} Terraform files")
+    logger.info("Fixed %d Terraform files", len(files))
     
     return state
 
 
 def fix_docker(state: CICDState) -> CICDState:
     if not can_attempt_fix(state, "docker"):
-        print("Max fix attempts reached for Docker")
+        logger.info("Max fix attempts reached for Docker")
         return state
     
     files = state["files"]["docker"]
     if not files:
         return state
     
-    print(f"Attempting to fix Docker files (attempt {state['fix_attempts']['docker']['attempts'] + 1}/3)")
-    
-    base_image_updates = {
-        'FROM python:': 'FROM python:3.11-slim',
-        'FROM node:': 'FROM node:20-alpine',
-        'FROM ubuntu:': 'FROM ubuntu:22.04',
-        'FROM alpine:': 'FROM alpine:3.18',
-    }
+    logger.info("Attempting to fix Docker files (attempt %d/3)",
+                get_or_create_fix_attempt(state, "docker").attempts + 1)
     
     for dockerfile in files:
+        # One read + C-level splitlines instead of readlines' buffered
+        # line-by-line allocation; mirrored by one write at the end
         with open(dockerfile, 'r') as f:
-            lines = f.readlines()
-        
+            lines = f.read().splitlines(keepends=True)
+
+
+        # Hoist the loop-invariant scans: re-checking the whole file for
+        # WORKDIR/USER on every line made the loop quadratic
+        has_workdir = any('WORKDIR' in l for l in lines)
+        has_user = any('USER' in l for l in lines)
+
+        changed = False
         fixed_lines = []
         for line in lines:
-            original_line = line
-            
-            # Fix base images to latest stable
-            for old, new in base_image_updates.items():
-                if line.strip().startswith('FROM') and old in line:
-                    if 'latest' not in line and ':' not in line.split(old)[1].split()[0]:
-                        line = line.replace(old.split(':')[0] + ':', new)
-                        print(f"  Updated base image in {dockerfile}")
-            
+            stripped = line.strip()
+
+            # Pin untagged base images to the latest stable tag
+            from_match = _FROM_RE.match(line)
+            if from_match and not from_match.group(2):
+                line = _FROM_RE.sub(f"FROM {_IMAGE_MAP[from_match.group(1)]}",
+                                    line, count=1)
+                stripped = line.strip()
+                changed = True
+                logger.info("  Updated base image in %s", dockerfile)
+
             # Add WORKDIR if missing
-            if line.strip().startswith('FROM') and not any('WORKDIR' in l for l in lines):
+            if stripped.startswith('FROM') and not has_workdir:
                 fixed_lines.append(line)
                 fixed_lines.append('WORKDIR /app\n')
+                has_workdir = True
+                changed = True
                 continue
-            
+
             # Add USER if missing (security fix)
-            if line.strip().startswith('CMD') or line.strip().startswith('ENTRYPOINT'):
-                if not any('USER' in l for l in lines):
+            if stripped.startswith('CMD') or stripped.startswith('ENTRYPOINT'):
+                if not has_user:
                     fixed_lines.append('USER 1000\n')
-            
+                    has_user = True
+                    changed = True
+
             fixed_lines.append(line)
-        
-        with open(dockerfile, 'w') as f:
-            f.writelines(fixed_lines)
+
+        # Already-compliant files keep their mtime: no write, no
+        # downstream cache or watcher churn
+        if changed:
+            with open(dockerfile, 'w') as f:
+                f.write(''.join(fixed_lines))
     
     increment_fix_attempt(state, "docker")
-    state["files_fixed"].extend(files)
+    state["files_fixed"].update(dict.fromkeys(files))
     state["fix_applied"] = True
-    print(f"Fixed {len(files)} Docker files")
+    logger.info("Fixed %d Docker files", len(files))
     
     return state
 
 
 def fix_helm(state: CICDState) -> CICDState:
     if not can_attempt_fix(state, "helm"):
-        print("Max fix attempts reached for Helm")
+        logger.info("Max fix attempts reached for Helm")
         return state
     
     files = state["files"]["helm"]
     if not files:
         return state
     
-    print(f"Attempting to fix Helm files (attempt {state['fix_attempts']['helm']['attempts'] + 1}/3)")
-    
-    chart_dirs = set()
-    for f in files:
-        chart_dir = os.path.dirname(f)
-        while chart_dir and not os.path.exists(os.path.join(chart_dir, "Chart.yaml")):
-            chart_dir = os.path.dirname(chart_dir)
-        if chart_dir:
-            chart_dirs.add(chart_dir)
+    logger.info("Attempting to fix Helm files (attempt %d/3)",
+                get_or_create_fix_attempt(state, "helm").attempts + 1)
     
+    # Resolve chart roots through the discovery-time index: set lookups
+    # instead of re-statting the same ancestors for every file
+    chart_dirs = find_chart_dirs(files, set(state.get("chart_index") or []))
+
+
     for chart_dir in chart_dirs:
         chart_yaml = os.path.join(chart_dir, "Chart.yaml")
         
@@ -169,11 +216,11 @@ def fix_helm(state: CICDState) -> CICDState:
             with open(chart_yaml, 'w') as f:
                 f.write(content)
             
-            print(f"  Fixed Chart.yaml in {chart_dir}")
+            logger.info("  Fixed Chart.yaml in %s", chart_dir)
     
     increment_fix_attempt(state, "helm")
-    state["files_fixed"].extend(files)
+    state["files_fixed"].update(dict.fromkeys(files))
     state["fix_applied"] = True
-    print(f"Fixed {len(files)} Helm files")
+    logger.info("Fixed %d Helm files", len(files))
     
     return state
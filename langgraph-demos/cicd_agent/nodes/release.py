@@ -1,98 +1,237 @@
+import asyncio
+import io
+import logging
 import os
+import posixpath
+import re
 import subprocess
+import tarfile
+import tempfile
+from collections import deque
 from datetime import datetime
 from ..state import CICDState
+from ..utils import cache
+from ..utils.helm import find_chart_dirs
+
+# Talking to the Docker daemon directly skips the ~300ms CLI startup
+# per invocation; fall back to buildx bake when unavailable
+try:
+    import aiodocker
+except ImportError:
+    aiodocker = None
+
+logger = logging.getLogger(__name__)
 
 
 def run_command(cmd: list, cwd: str = None) -> tuple:
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd, timeout=300)
-        return result.returncode == 0, result.stdout, result.stderr
+        # Stream instead of capture_output: terraform and docker can
+        # emit megabytes, so keep only a bounded tail in memory
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                text=True, cwd=cwd, bufsize=1)
+        tail = deque(maxlen=500)
+        for line in proc.stdout:
+            tail.append(line)
+        returncode = proc.wait(timeout=300)
+        return returncode == 0, "".join(tail), ""
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        return False, "", f"Timed out: {' '.join(cmd)}"
     except Exception as e:
         return False, "", str(e)
 
 
-def release_docker(state: CICDState) -> CICDState:
+async def _run_command_async(cmd: list, cwd: str = None) -> tuple:
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=cwd
+        )
+        tail = deque(maxlen=500)
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                break
+            tail.append(line.decode(errors="replace"))
+        await proc.wait()
+        return proc.returncode == 0, "".join(tail), ""
+    except Exception as e:
+        return False, "", str(e)
+
+
+def _image_name(docker_dir: str, cwd: str) -> str:
+    """Image name from a context dir without an abspath/getcwd per call"""
+    full = docker_dir if os.path.isabs(docker_dir) else posixpath.join(cwd, docker_dir)
+    return posixpath.basename(posixpath.normpath(full)).lower()
+
+
+def _context_tar(context_dir: str) -> io.BytesIO:
+    """Tar a build context in memory for the daemon's build endpoint"""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w') as tar:
+        tar.add(context_dir, arcname='.')
+    buf.seek(0)
+    return buf
+
+
+async def _build_with_daemon(targets: list) -> list:
+    """Build every (context, dockerfile, tag) concurrently via aiodocker"""
+    docker = aiodocker.Docker()
+    built_images = []
+    try:
+        async def build_one(context_dir, dockerfile_name, tag):
+            tar = await asyncio.to_thread(_context_tar, context_dir)
+            # aiodocker requires an encoding whenever fileobj is used;
+            # the tar is uncompressed, so declare it as identity
+            await docker.images.build(fileobj=tar,
+                                      encoding="identity",
+                                      path_dockerfile=dockerfile_name,
+                                      tag=tag, stream=False)
+            return tag
+
+        results = await asyncio.gather(
+            *[build_one(*target) for target in targets],
+            return_exceptions=True
+        )
+        for target, result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error("  ✗ Failed to build %s: %s", target[2], result)
+            else:
+                built_images.append(result)
+                logger.info("  ✓ Built %s", result)
+    finally:
+        await docker.close()
+    return built_images
+
+
+def _write_bake_file(files: list, timestamp: str) -> tuple:
+    """Write a docker-bake.hcl covering every Dockerfile
+
+    Returns (bake_path, tags). One buildx bake invocation over all
+    targets lets BuildKit build images concurrently and deduplicate
+    shared layers instead of repeating them per sequential build.
+    """
+    targets = []
+    target_names = []
+    tags = []
+    cwd = os.getcwd()
+    for index, dockerfile in enumerate(files):
+        docker_dir = os.path.dirname(dockerfile) or "."
+        image_name = _image_name(docker_dir, cwd)
+        # HCL target names must be identifiers; index keeps them unique
+        target_name = re.sub(r'[^a-z0-9_-]', '_', f"{image_name}_{index}")
+        tag = f"{image_name}:{timestamp}"
+        target_names.append(target_name)
+        tags.append(tag)
+        # bake resolves relative paths against the bake file's own
+        # directory — which is the temp dir here — so the context must
+        # be absolute (the dockerfile is resolved against the context)
+        targets.append(
+            f'target "{target_name}" {{\n'
+            f'  context = "{os.path.abspath(docker_dir)}"\n'
+            f'  dockerfile = "{os.path.basename(dockerfile)}"\n'
+            f'  tags = ["{tag}"]\n'
+            f'  args = {{ BUILDKIT_INLINE_CACHE = "1" }}\n'
+            f'}}\n'
+        )
+    group = 'group "default" {\n  targets = [%s]\n}\n' % ", ".join(
+        f'"{name}"' for name in target_names
+    )
+    fd, bake_path = tempfile.mkstemp(suffix=".hcl", prefix="docker-bake-")
+    with os.fdopen(fd, 'w') as f:
+        f.write(group)
+        f.write("\n".join(targets))
+    return bake_path, tags
+
+
+async def release_docker(state: CICDState) -> CICDState:
     files = state["files"]["docker"]
     built_images = []
-    
+
     if not files:
-        print("No Docker files to release")
+        logger.info("No Docker files to release")
         state["release_results"]["docker"] = {"status": "skipped"}
         return state
-    
-    print(f"\nReleasing Docker images...")
-    
+
+    logger.info("Releasing Docker images...")
+
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    for dockerfile in files:
-        docker_dir = os.path.dirname(dockerfile) or "."
-        image_name = os.path.basename(os.path.abspath(docker_dir)).lower()
-        tag = f"{image_name}:{timestamp}"
-        
-        print(f"  Building {tag}...")
-        
-        # Build image
-        passed, stdout, stderr = run_command(
-            ["docker", "build", "-t", tag, "."],
-            cwd=docker_dir
-        )
-        
-        if passed:
-            built_images.append(tag)
-            print(f"    ✓ Built {tag}")
-            
-            # Optional: Push to registry (configure as needed)
-            # run_command(["docker", "push", tag])
-        else:
-            print(f"    ✗ Failed to build {tag}: {stderr}")
-    
+
+    if aiodocker is not None:
+        # Submit every build to the daemon concurrently over its socket
+        targets = []
+        cwd = os.getcwd()
+        for dockerfile in files:
+            docker_dir = os.path.dirname(dockerfile) or "."
+            image_name = _image_name(docker_dir, cwd)
+            targets.append((docker_dir, os.path.basename(dockerfile),
+                            f"{image_name}:{timestamp}"))
+        logger.info("  Building %d images via daemon...", len(targets))
+        built_images = await _build_with_daemon(targets)
+    else:
+        # One bake run builds every target in parallel; BuildKit shares
+        # common layers across targets instead of rebuilding them per image
+        bake_path, tags = _write_bake_file(files, timestamp)
+        try:
+            logger.info("  Baking %d images...", len(tags))
+            passed, stdout, stderr = await asyncio.to_thread(
+                run_command,
+                ["docker", "buildx", "bake", "-f", bake_path, "--load"]
+            )
+            if passed:
+                built_images = tags
+                for tag in tags:
+                    logger.info("  ✓ Built %s", tag)
+                # Optional: Push to registry (configure as needed)
+                # run_command(["docker", "buildx", "bake", "-f", bake_path, "--push"])
+            else:
+                logger.error("  ✗ Bake failed: %s", stderr)
+        finally:
+            os.unlink(bake_path)
+
     state["docker_images_built"] = built_images
     state["release_results"]["docker"] = {
         "status": "success" if built_images else "failed",
         "images": built_images
     }
-    
-    print(f"Built {len(built_images)} Docker images")
+
+    logger.info("Built %d Docker images", len(built_images))
     return state
 
 
-def release_helm(state: CICDState) -> CICDState:
+async def release_helm(state: CICDState) -> CICDState:
     files = state["files"]["helm"]
     released_charts = []
-    
+
     if not files:
-        print("No Helm charts to release")
+        logger.info("No Helm charts to release")
         state["release_results"]["helm"] = {"status": "skipped"}
         return state
-    
-    print(f"\nReleasing Helm charts...")
-    
-    chart_dirs = set()
-    for f in files:
-        chart_dir = os.path.dirname(f)
-        while chart_dir and not os.path.exists(os.path.join(chart_dir, "Chart.yaml")):
-            chart_dir = os.path.dirname(chart_dir)
-        if chart_dir:
-            chart_dirs.add(chart_dir)
-    
-    for chart_dir in chart_dirs:
+
+    logger.info("Releasing Helm charts...")
+
+    chart_dirs = sorted(find_chart_dirs(files, set(state.get("chart_index") or [])))
+
+    # Charts are independent — package them all concurrently
+    results = await asyncio.gather(*[
+        _run_command_async(["helm", "package", chart_dir, "--destination", "./dist"])
+        for chart_dir in chart_dirs
+    ])
+
+    for chart_dir, (passed, stdout, stderr) in zip(chart_dirs, results):
         chart_name = os.path.basename(chart_dir)
-        print(f"  Packaging {chart_name}...")
-        
-        # Package chart
-        passed, stdout, stderr = run_command(
-            ["helm", "package", chart_dir, "--destination", "./dist"]
-        )
-        
         if passed:
             released_charts.append(chart_name)
-            print(f"    ✓ Packaged {chart_name}")
-            
+            logger.info("  ✓ Packaged %s", chart_name)
+
             # Optional: Push to chart repo
             # run_command(["helm", "push", f"./dist/{chart_name}-*.tgz", "chart-repo"])
         else:
-            print(f"    ✗ Failed to package {chart_name}: {stderr}")
+            logger.error("  ✗ Failed to package %s: %s", chart_name, stderr or stdout)
     
     state["helm_charts_released"] = released_charts
     state["release_results"]["helm"] = {
@@ -100,50 +239,87 @@ def release_helm(state: CICDState) -> CICDState:
         "charts": released_charts
     }
     
-    print(f"Released {len(released_charts)} Helm charts")
+    logger.info("Released %d Helm charts", len(released_charts))
     return state
 
 
-def release_terraform(state: CICDState) -> CICDState:
+def _maybe_save_last_run(state: CICDState):
+    """Record the run so an unchanged file set can skip the next one
+
+    release_terraform is the final release node, so this is the one
+    terminal point; the record is written only when every stage ended
+    success or skipped — a failed docker or helm stage must not be
+    replayed as a successful run by check_skip.
+    """
+    results = state["release_results"]
+    if results and all(r.get("status") in ("success", "skipped")
+                       for r in results.values()):
+        cache.save_last_run(state.get("file_set_hash", ""), results)
+
+
+async def release_terraform(state: CICDState) -> CICDState:
     files = state["files"]["terraform"]
-    
+
     if not files:
-        print("No Terraform files to release")
+        logger.info("No Terraform files to release")
         state["release_results"]["terraform"] = {"status": "skipped"}
+        _maybe_save_last_run(state)
         return state
-    
-    print(f"\nApplying Terraform...")
-    
-    tf_dirs = set(os.path.dirname(f) for f in files)
-    
-    for tf_dir in tf_dirs:
-        print(f"  Planning in {tf_dir}...")
-        
-        # terraform plan
-        passed, stdout, stderr = run_command(["terraform", "plan", "-out=tfplan"], cwd=tf_dir)
-        
-        if passed:
-            print(f"    ✓ Plan created")
-            
-            # terraform apply
-            print(f"  Applying in {tf_dir}...")
-            passed, stdout, stderr = run_command(
-                ["terraform", "apply", "-auto-approve", "tfplan"],
-                cwd=tf_dir
+
+    logger.info("Applying Terraform...")
+
+    tf_dirs = sorted({os.path.dirname(f) for f in files})
+    per_dir = {}
+
+    # Plans are read-only and independent across modules; run them
+    # concurrently, capped so provider APIs are not hammered
+    sem = asyncio.Semaphore(4)
+
+    async def plan(tf_dir):
+        async with sem:
+            logger.info("  Planning in %s...", tf_dir)
+            return tf_dir, await _run_command_async(
+                ["terraform", "plan", "-out=tfplan"], cwd=tf_dir
             )
-            
-            if passed:
-                state["terraform_applied"] = True
-                print(f"    ✓ Terraform applied successfully")
-            else:
-                print(f"    ✗ Terraform apply failed: {stderr}")
-                state["release_results"]["terraform"] = {"status": "failed", "error": stderr}
-                return state
+
+    plans = await asyncio.gather(*(plan(tf_dir) for tf_dir in tf_dirs))
+
+    planned = []
+    failed = False
+    for tf_dir, (passed, stdout, stderr) in plans:
+        if passed:
+            logger.info("  ✓ Plan created in %s", tf_dir)
+            planned.append(tf_dir)
         else:
-            print(f"    ✗ Terraform plan failed: {stderr}")
-            state["release_results"]["terraform"] = {"status": "failed", "error": stderr}
-            return state
-    
-    state["release_results"]["terraform"] = {"status": "success"}
-    print(f"✓ Terraform infrastructure deployed")
+            logger.error("  ✗ Terraform plan failed in %s: %s", tf_dir, stderr or stdout)
+            per_dir[tf_dir] = {"status": "plan_failed", "error": stderr or stdout}
+            failed = True
+
+    # Applies mutate real infrastructure — keep them strictly serial,
+    # and only for directories whose plan succeeded
+    for tf_dir in planned:
+        logger.info("  Applying in %s...", tf_dir)
+        passed, stdout, stderr = await asyncio.to_thread(
+            run_command,
+            ["terraform", "apply", "-auto-approve", "tfplan"],
+            tf_dir
+        )
+
+        if passed:
+            state["terraform_applied"] = True
+            per_dir[tf_dir] = {"status": "success"}
+            logger.info("  ✓ Terraform applied in %s", tf_dir)
+        else:
+            logger.error("  ✗ Terraform apply failed in %s: %s", tf_dir, stderr or stdout)
+            per_dir[tf_dir] = {"status": "apply_failed", "error": stderr or stdout}
+            failed = True
+
+    state["release_results"]["terraform"] = {
+        "status": "failed" if failed else "success",
+        "per_dir": per_dir
+    }
+    if not failed:
+        logger.info("✓ Terraform infrastructure deployed")
+
+    _maybe_save_last_run(state)
     return state
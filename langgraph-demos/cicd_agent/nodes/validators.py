@@ -1,159 +1,174 @@
-import subprocess
+import asyncio
+import logging
 import os
+from collections import deque
 from typing import List
 from ..state import CICDState, ValidationResult
+from ..utils import cache
+from ..utils.helm import find_chart_dirs
 
+logger = logging.getLogger(__name__)
 
-def run_command(cmd: List[str], cwd: str = None) -> tuple:
+# Local BuildKit layer cache shared across validation builds
+_BUILDKIT_CACHE = os.path.join(cache.CACHE_DIR, "buildkit")
+os.makedirs(_BUILDKIT_CACHE, exist_ok=True)
+
+
+async def run_command(cmd: List[str], cwd: str = None) -> tuple:
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
             cwd=cwd,
-            timeout=300
+            env=dict(os.environ, DOCKER_BUILDKIT="1")
         )
-        return result.returncode == 0, result.stdout, result.stderr
+
+        # Stream instead of communicate(): tools like checkov and
+        # docker build can emit megabytes, so keep only a bounded tail
+        tail = deque(maxlen=500)
+
+        async def _drain():
+            while True:
+                line = await proc.stdout.readline()
+                if not line:
+                    break
+                tail.append(line.decode(errors="replace"))
+            await proc.wait()
+
+        try:
+            await asyncio.wait_for(_drain(), timeout=300)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return False, "", f"Timed out: {' '.join(cmd)}"
+        return proc.returncode == 0, "".join(tail), ""
     except Exception as e:
         return False, "", str(e)
 
 
-def validate_terraform(state: CICDState) -> CICDState:
-    files = state["files"]["terraform"]
-    results = []
-    
-    if not files:
-        print("No Terraform files to validate")
-        state["validation_results"]["terraform"] = results
-        return state
-    
-    tf_dirs = set()
-    for f in files:
-        tf_dirs.add(os.path.dirname(f))
-    
-    for tf_dir in tf_dirs:
-        print(f"Validating Terraform in: {tf_dir}")
-        
-        # terraform validate
-        passed, stdout, stderr = run_command(["terraform", "validate"], cwd=tf_dir)
-        results.append({
-            "file_path": tf_dir,
-            "tool": "terraform_validate",
-            "passed": passed,
-            "errors": [] if passed else [stderr or stdout],
-            "warnings": []
-        })
-        
-        # tflint
-        passed, stdout, stderr = run_command(["tflint"], cwd=tf_dir)
-        results.append({
-            "file_path": tf_dir,
-            "tool": "tflint",
-            "passed": passed,
-            "errors": [] if passed else [stderr or stdout],
-            "warnings": [] if passed else [stdout]
-        })
-        
-        # checkov
-        passed, stdout, stderr = run_command(
+def _make_result(file_path: str, file_type: str, tool: str, passed: bool,
+                 stdout: str, stderr: str,
+                 warn_from_stdout: bool = False) -> ValidationResult:
+    return {
+        "file_path": file_path,
+        "file_type": file_type,
+        "tool": tool,
+        "passed": passed,
+        "errors": [] if passed else [stderr or stdout],
+        "warnings": [stdout] if (warn_from_stdout and not passed) else []
+    }
+
+
+def plan_validation_units(state: CICDState) -> List[dict]:
+    """
+    Expand discovered files into independent (tool, target) work units
+
+    Each unit becomes its own validate_unit node via the Send API, so the
+    scheduler can run every tool invocation in parallel instead of
+    blocking on the slowest file-type group.
+    """
+    files = state["files"]
+    units = []
+
+    for tf_dir in sorted({os.path.dirname(f) for f in files["terraform"]}):
+        for tool in ("terraform_validate", "tflint", "checkov"):
+            units.append({"file_type": "terraform", "tool": tool, "path": tf_dir})
+
+    for index, dockerfile in enumerate(files["docker"]):
+        units.append({"file_type": "docker", "tool": "hadolint", "path": dockerfile})
+        units.append({"file_type": "docker", "tool": "docker_build",
+                      "path": dockerfile, "index": index})
+
+    chart_index = set(state.get("chart_index") or [])
+    for chart_dir in sorted(find_chart_dirs(files["helm"], chart_index)):
+        for tool in ("helm_lint", "helm_template"):
+            units.append({"file_type": "helm", "tool": tool, "path": chart_dir})
+
+    return units
+
+
+def reset_validation_round(state: CICDState) -> dict:
+    """Clear the flat results accumulator before a new fan-out"""
+    return {"validation_results_flat": None}
+
+
+async def validate_unit(unit: dict) -> dict:
+    """
+    Run a single validation tool against a single target
+
+    Receives a Send payload from plan_validation_units and contributes
+    one result to the validation_results_flat reducer field.
+    """
+    file_type = unit["file_type"]
+    tool = unit["tool"]
+    path = unit["path"]
+
+    # Skip the tool entirely when the target content is unchanged since
+    # the last passing run
+    key = cache.cache_key(path)
+    cached = cache.get(tool, key)
+    if cached is not None:
+        logger.info("Validation cache hit %s [%s]: %s", file_type, tool, path)
+        return {"validation_results_flat": [cached]}
+
+    logger.info("Validating %s [%s]: %s", file_type, tool, path)
+
+    if tool == "terraform_validate":
+        passed, stdout, stderr = await run_command(["terraform", "validate"], cwd=path)
+        result = _make_result(path, file_type, tool, passed, stdout, stderr)
+
+    elif tool == "tflint":
+        passed, stdout, stderr = await run_command(["tflint"], cwd=path)
+        result = _make_result(path, file_type, tool, passed, stdout, stderr,
+                              warn_from_stdout=True)
+
+    elif tool == "checkov":
+        passed, stdout, stderr = await run_command(
             ["checkov", "-d", ".", "--framework", "terraform", "--quiet"],
-            cwd=tf_dir
+            cwd=path
         )
-        results.append({
-            "file_path": tf_dir,
-            "tool": "checkov",
-            "passed": passed,
-            "errors": [] if passed else [stderr or stdout],
-            "warnings": []
-        })
-    
-    state["validation_results"]["terraform"] = results
-    return state
-
-
-def validate_docker(state: CICDState) -> CICDState:
-    files = state["files"]["docker"]
-    results = []
-    
-    if not files:
-        print("No Docker files to validate")
-        state["validation_results"]["docker"] = results
-        return state
-    
-    for dockerfile in files:
-        print(f"Validating Docker file: {dockerfile}")
-        docker_dir = os.path.dirname(dockerfile) or "."
-        
-        # hadolint
-        passed, stdout, stderr = run_command(["hadolint", dockerfile])
-        results.append({
-            "file_path": dockerfile,
-            "tool": "hadolint",
-            "passed": passed,
-            "errors": [] if passed else [stderr or stdout],
-            "warnings": [] if passed else [stdout]
-        })
-        
-        # docker build test
-        passed, stdout, stderr = run_command(
-            ["docker", "build", "--no-cache", "-t", "test-build", "."],
+        result = _make_result(path, file_type, tool, passed, stdout, stderr)
+
+    elif tool == "hadolint":
+        passed, stdout, stderr = await run_command(["hadolint", path])
+        result = _make_result(path, file_type, tool, passed, stdout, stderr,
+                              warn_from_stdout=True)
+
+    elif tool == "docker_build":
+        docker_dir = os.path.dirname(path) or "."
+        # Unique tag per file so parallel builds do not collide
+        tag = f"test-build-{unit.get('index', 0)}"
+        # Reuse cached layers from previous validation rounds: only the
+        # layers after the edited instruction actually rebuild
+        passed, stdout, stderr = await run_command(
+            ["docker", "buildx", "build",
+             "--cache-from", f"type=local,src={_BUILDKIT_CACHE}",
+             "--cache-to", f"type=local,dest={_BUILDKIT_CACHE},mode=max",
+             "-t", tag, "--load", "."],
             cwd=docker_dir
         )
-        results.append({
-            "file_path": dockerfile,
-            "tool": "docker_build",
-            "passed": passed,
-            "errors": [] if passed else [stderr or stdout],
-            "warnings": []
-        })
-        
         # Clean up test image
         if passed:
-            run_command(["docker", "rmi", "test-build"], cwd=docker_dir)
-    
-    state["validation_results"]["docker"] = results
-    return state
-
-
-def validate_helm(state: CICDState) -> CICDState:
-    files = state["files"]["helm"]
-    results = []
-    
-    if not files:
-        print("No Helm files to validate")
-        state["validation_results"]["helm"] = results
-        return state
-    
-    chart_dirs = set()
-    for f in files:
-        chart_dir = os.path.dirname(f)
-        while chart_dir and not os.path.exists(os.path.join(chart_dir, "Chart.yaml")):
-            chart_dir = os.path.dirname(chart_dir)
-        if chart_dir:
-            chart_dirs.add(chart_dir)
-    
-    for chart_dir in chart_dirs:
-        print(f"Validating Helm chart: {chart_dir}")
-        
-        # helm lint
-        passed, stdout, stderr = run_command(["helm", "lint", chart_dir])
-        results.append({
-            "file_path": chart_dir,
-            "tool": "helm_lint",
-            "passed": passed,
-            "errors": [] if passed else [stderr or stdout],
-            "warnings": [] if passed else [stdout]
-        })
-        
-        # helm template
-        passed, stdout, stderr = run_command(["helm", "template", chart_dir])
-        results.append({
-            "file_path": chart_dir,
-            "tool": "helm_template",
-            "passed": passed,
-            "errors": [] if passed else [stderr or stdout],
-            "warnings": []
-        })
-    
-    state["validation_results"]["helm"] = results
-    return state
+            await run_command(["docker", "rmi", tag], cwd=docker_dir)
+        result = _make_result(path, file_type, tool, passed, stdout, stderr)
+
+    elif tool == "helm_lint":
+        passed, stdout, stderr = await run_command(["helm", "lint", path])
+        result = _make_result(path, file_type, tool, passed, stdout, stderr,
+                              warn_from_stdout=True)
+
+    elif tool == "helm_template":
+        passed, stdout, stderr = await run_command(["helm", "template", path])
+        result = _make_result(path, file_type, tool, passed, stdout, stderr)
+
+    else:
+        result = _make_result(path, file_type, tool, False, "",
+                              f"Unknown validation tool: {tool}")
+
+    # Only passing results are cached: failures may come from missing
+    # tools or environment issues rather than the target's content
+    if result["passed"]:
+        cache.put(tool, key, result)
+
+    return {"validation_results_flat": [result]}
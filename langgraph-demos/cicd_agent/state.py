@@ -1,31 +1,72 @@
-from typing import TypedDict, List, Dict, Any, Optional
+import sys
+from dataclasses import dataclass
+from typing import Annotated, TypedDict, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 
 class ValidationResult(TypedDict):
     file_path: str
+    file_type: str
     tool: str
     passed: bool
     errors: List[str]
     warnings: List[str]
 
 
-class FixAttempt(TypedDict):
+def merge_flat_results(existing: Optional[List[ValidationResult]],
+                       new: Optional[List[ValidationResult]]) -> List[ValidationResult]:
+    """
+    Reducer for the Send-based validation fan-out
+
+    Each validate_unit node contributes its single result; None resets
+    the accumulator at the start of a validation round. Results are
+    deduplicated on (file_type, tool, file_path) so nodes that return
+    the full state cannot double-count.
+    """
+    if new is None:
+        return []
+    existing = existing or []
+    merged = list(existing)
+    seen = {(r["file_type"], r["tool"], r["file_path"]) for r in existing}
+    for result in new:
+        key = (result["file_type"], result["tool"], result["file_path"])
+        if key not in seen:
+            merged.append(result)
+            seen.add(key)
+    return merged
+
+
+@dataclass(slots=True)
+class FixAttempt:
+    """Per-file-type fix counter
+
+    A slots dataclass: the hot attempts/max_attempts accesses are
+    C-level slot reads instead of hashed dict lookups, and each
+    instance carries no per-object __dict__.
+    """
     file_type: str
-    attempts: int
-    max_attempts: int
-    last_fix_time: Optional[str]
+    attempts: int = 0
+    max_attempts: int = 3
+    last_fix_time: Optional[str] = None
 
 
 class CICDState(TypedDict):
     user_paths: List[str]
-    files: Dict[str, List[str]]
+    # File lists are tuples after discovery so superstep merges share
+    # one immutable reference instead of copying per node
+    files: Dict[str, Tuple[str, ...]]
+    chart_index: Tuple[str, ...]
+    file_set_hash: str
     validation_results: Dict[str, List[ValidationResult]]
+    validation_results_flat: Annotated[List[ValidationResult], merge_flat_results]
     all_validations_complete: bool
+    total_errors: int
     collected_errors: Dict[str, List[str]]
     errors_by_file: Dict[str, List[str]]
     fix_attempts: Dict[str, FixAttempt]
-    files_fixed: List[str]
+    # dict-as-ordered-set: re-entrant fix attempts dedup in O(1) per
+    # file instead of growing an unbounded list across attempts
+    files_fixed: Dict[str, None]
     fix_applied: bool
     release_ready: bool
     release_results: Dict[str, Any]
@@ -36,16 +77,26 @@ class CICDState(TypedDict):
     error_message: Optional[str]
 
 
+# Every node probes these keys at every superstep; interning makes the
+# dict lookups pointer comparisons against the (interned) source literals
+for _key in CICDState.__annotations__:
+    sys.intern(_key)
+
+
 def create_initial_state(user_paths: List[str]) -> CICDState:
     return {
         "user_paths": user_paths,
-        "files": {"terraform": [], "docker": [], "helm": []},
+        "files": {"terraform": (), "docker": (), "helm": ()},
+        "chart_index": (),
+        "file_set_hash": "",
         "validation_results": {},
+        "validation_results_flat": [],
         "all_validations_complete": False,
+        "total_errors": 0,
         "collected_errors": {},
         "errors_by_file": {},
         "fix_attempts": {},
-        "files_fixed": [],
+        "files_fixed": {},
         "fix_applied": False,
         "release_ready": False,
         "release_results": {},
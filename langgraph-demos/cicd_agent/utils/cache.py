@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+
+CACHE_DIR = os.path.expanduser("~/.cache/cicd_agent")
+_CACHE_FILE = os.path.join(CACHE_DIR, "validation_cache.json")
+_LASTRUN_FILE = os.path.join(CACHE_DIR, "lastrun.json")
+
+_cache = None
+
+
+def _load() -> dict:
+    global _cache
+    if _cache is None:
+        try:
+            with open(_CACHE_FILE, 'r') as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def _save():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = _CACHE_FILE + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(_cache, f)
+    os.replace(tmp_path, _CACHE_FILE)
+
+
+def cache_key(path: str) -> str:
+    """
+    Content hash for a validation target
+
+    For a file, hashes its bytes plus a canonical (relpath, size,
+    mtime_ns) listing of its directory — the build context. For a
+    directory, hashes the listing alone. Returns "" when the target
+    cannot be read, which disables caching for it.
+    """
+    h = hashlib.sha256()
+
+    if os.path.isfile(path):
+        try:
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        except OSError:
+            return ""
+        context_dir = os.path.dirname(path) or "."
+    elif os.path.isdir(path):
+        context_dir = path
+    else:
+        return ""
+
+    entries = []
+    for root, dirs, files in os.walk(context_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            full_path = os.path.join(root, name)
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+            entries.append((os.path.relpath(full_path, context_dir),
+                            st.st_size, st.st_mtime_ns))
+
+    for entry in sorted(entries):
+        h.update(repr(entry).encode())
+
+    return h.hexdigest()
+
+
+def file_set_hash(files: dict) -> str:
+    """
+    Signature of the whole discovered file set
+
+    Hashes the sorted (path, size, mtime_ns) of every discovered file,
+    so an unchanged working tree produces the same signature as the
+    previous run without reading any file contents.
+    """
+    h = hashlib.sha256()
+    entries = []
+    for paths in files.values():
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime_ns))
+    for entry in sorted(entries):
+        h.update(repr(entry).encode())
+    return h.hexdigest()
+
+
+def get_last_run():
+    """Return the record of the last successful run, or None"""
+    try:
+        with open(_LASTRUN_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_last_run(file_hash: str, release_results: dict):
+    """Atomically record a successful run's file-set hash and results"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = _LASTRUN_FILE + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({"hash": file_hash, "release_results": release_results}, f)
+    os.replace(tmp_path, _LASTRUN_FILE)
+
+
+def get(tool: str, key: str):
+    """Return the cached validation result for (tool, key), or None"""
+    if not key:
+        return None
+    return _load().get(f"{tool}:{key}")
+
+
+def put(tool: str, key: str, result: dict):
+    """Persist a validation result under (tool, key)"""
+    if not key:
+        return
+    _load()[f"{tool}:{key}"] = result
+    _save()
@@ -1,11 +1,26 @@
+import functools
+import os
 import re
 
+# One compiled pass over the whole file replaces the per-line
+# startswith chain; Dockerfile directives are case-insensitive
+_DIRECTIVE_RE = re.compile(
+    r'(?im)^[ \t]*(FROM|EXPOSE|WORKDIR|USER|HEALTHCHECK|RUN|CMD|ENTRYPOINT)\b[ \t]*(.*)$'
+)
+
 
 def parse_dockerfile(dockerfile_path: str) -> dict:
     """Parse Dockerfile and extract key information"""
+    return _parse_dockerfile_cached(dockerfile_path,
+                                    os.stat(dockerfile_path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_dockerfile_cached(dockerfile_path: str, mtime_ns: int) -> dict:
+    # mtime_ns keys the cache so edits invalidate stale entries
     with open(dockerfile_path, 'r') as f:
         content = f.read()
-    
+
     info = {
         'base_image': None,
         'exposed_ports': [],
@@ -15,22 +30,23 @@ def parse_dockerfile(dockerfile_path: str) -> dict:
         'has_healthcheck': False
     }
     
-    for line in content.split('\n'):
-        line = line.strip()
-        
-        if line.startswith('FROM'):
-            info['base_image'] = line.split()[1] if len(line.split()) > 1 else None
-        elif line.startswith('EXPOSE'):
-            info['exposed_ports'].extend(line.split()[1:])
-        elif line.startswith('WORKDIR'):
+    for match in _DIRECTIVE_RE.finditer(content):
+        directive = match.group(1).upper()
+        rest = match.group(2).strip()
+
+        if directive == 'FROM':
+            info['base_image'] = rest.split()[0] if rest else None
+        elif directive == 'EXPOSE':
+            info['exposed_ports'].extend(rest.split())
+        elif directive == 'WORKDIR':
             info['has_workdir'] = True
-        elif line.startswith('USER'):
+        elif directive == 'USER':
             info['has_user'] = True
-        elif line.startswith('HEALTHCHECK'):
+        elif directive == 'HEALTHCHECK':
             info['has_healthcheck'] = True
-        elif line.startswith(('RUN', 'CMD', 'ENTRYPOINT')):
-            info['commands'].append(line)
-    
+        else:  # RUN, CMD, ENTRYPOINT
+            info['commands'].append(f"{directive} {rest}".strip())
+
     return info
 
 
@@ -1,19 +1,58 @@
 import os
+from pathlib import PurePath
+
 import yaml
 
+# libyaml's CSafeLoader parses an order of magnitude faster than the
+# pure-Python SafeLoader; fall back when PyYAML was built without it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+
+def index_chart_dirs(roots: list) -> set:
+    """Collect every directory containing a Chart.yaml in one walk per root"""
+    chart_dirs = set()
+    for root in roots:
+        for dirpath, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
+            if "Chart.yaml" in files:
+                chart_dirs.add(dirpath)
+    return chart_dirs
+
+
+def nearest_chart(path: str, chart_dirs: set) -> str:
+    """Nearest ancestor of path that is a chart root, or None"""
+    for parent in PurePath(path).parents:
+        if str(parent) in chart_dirs:
+            return str(parent)
+    return None
+
+
+def find_chart_dirs(files: list, chart_index: set = None) -> set:
+    """Find all Helm chart directories
+
+    With a chart_index (from index_chart_dirs) the ancestor walk is pure
+    set lookups with zero stat syscalls; without one it falls back to
+    probing Chart.yaml at each parent.
+    """
+    if chart_index is not None:
+        chart_dirs = {nearest_chart(f, chart_index) for f in files}
+        chart_dirs.discard(None)
+        return chart_dirs
 
-def find_chart_dirs(files: list) -> set:
-    """Find all Helm chart directories"""
     chart_dirs = set()
     for f in files:
         chart_dir = os.path.dirname(f)
-        while chart_dir and not os.path.exists(os.path.join(chart_dir, "Chart.yaml")):
+        while chart_dir:
+            if os.path.exists(os.path.join(chart_dir, "Chart.yaml")):
+                chart_dirs.add(chart_dir)
+                break
             parent = os.path.dirname(chart_dir)
             if parent == chart_dir:
                 break
             chart_dir = parent
-        if chart_dir and os.path.exists(os.path.join(chart_dir, "Chart.yaml")):
-            chart_dirs.add(chart_dir)
     return chart_dirs
 
 
@@ -21,8 +60,10 @@ def read_chart_yaml(chart_dir: str) -> dict:
     """Read and parse Chart.yaml"""
     chart_yaml_path = os.path.join(chart_dir, "Chart.yaml")
     if os.path.exists(chart_yaml_path):
-        with open(chart_yaml_path, 'r') as f:
-            return yaml.safe_load(f) or {}
+        with open(chart_yaml_path, 'rb') as f:
+            # Stream the handle straight into the loader; libyaml reads
+            # in chunks rather than materializing the whole file first
+            return yaml.load(f, Loader=_Loader) or {}
     return {}
 
 
@@ -1,15 +1,13 @@
 import os
 import re
 
+_PROVIDER_PATTERN = re.compile(r'provider\s+"([^"]+)"')
+
 
 def find_terraform_dirs(files: list) -> set:
-    return set(os.path.dirname(f) for f in files)
+    return {os.path.dirname(f) for f in files}
 
 
 def extract_providers(content: str) -> list:
     """Extract provider names from Terraform content"""
-    providers = []
-    pattern = r'provider\s+"([^"]+)"'
-    matches = re.findall(pattern, content)
-    providers.extend(matches)
-    return providers
+    return _PROVIDER_PATTERN.findall(content)
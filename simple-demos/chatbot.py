@@ -17,6 +17,13 @@ def multiply(a: int, b: int) -> int:
     return a * b
 
 
+# Intent keyword sets, intersected with the tokenized input in one
+# C-level probe per intent instead of a substring scan per keyword
+_ADD_WORDS = frozenset({"add", "sum"})
+_MULTIPLY_WORDS = frozenset({"multiply", "product"})
+_GREETING_WORDS = frozenset({"hello", "hi"})
+
+
 class ChatState(TypedDict):
     messages: list
 
@@ -25,13 +32,13 @@ def chat_node(state: ChatState) -> ChatState:
     last_message = state["messages"][-1] if state["messages"] else None
     
     if last_message and isinstance(last_message, HumanMessage):
-        user_input = last_message.content.lower()
-        
-        if "add" in user_input or "sum" in user_input:
+        words = {word.strip(".,!?") for word in last_message.content.lower().split()}
+
+        if words & _ADD_WORDS:
             response = "I can help Please provide two you add numbers. numbers."
-        elif "multiply" in user_input or "product" in user_input:
+        elif words & _MULTIPLY_WORDS:
             response = "I can help you multiply numbers. Please provide two numbers."
-        elif "hello" in user_input or "hi" in user_input:
+        elif words & _GREETING_WORDS:
             response = "Hello! How can I help you today?"
         else:
             response = f"You said: {last_message.content}. I'm a simple demo bot!"